@@ -1,7 +1,16 @@
 import os
+import re
+import time
+import threading
 import asyncio
-from dataclasses import dataclass
-from typing import Dict, List
+import concurrent.futures
+import itertools
+import logging
+import logging.handlers
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from queue import SimpleQueue
+from typing import Deque, Dict, List, Set
 
 import discord
 from discord import app_commands
@@ -23,17 +32,46 @@ if not TOKEN:
 # If you leave it as 0, commands are global and may take a while to show up.
 GUILD_ID = 0  # e.g. 123456789012345678
 
+# INFO shows every song that starts playing, WARNING only shows problems.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# ==============================
+# LOGGING
+# ==============================
+
+logger = logging.getLogger("musicbot")
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Log through a queue so the player thread never waits on writing to the terminal."""
+    log_queue = SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{"))
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    level = logging.getLevelName(LOG_LEVEL.upper())
+    logger.setLevel(level if isinstance(level, int) else logging.INFO)
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
 # ==============================
 # YT-DLP / FFMPEG OPTIONS
 # ==============================
 
 YTDL_OPTIONS = {
-    "format": "bestaudio/best",
+    # YouTube serves Opus audio, prefer it so ffmpeg can pass it through without re-encoding
+    "format": "bestaudio[acodec=opus]/bestaudio/best",
     "noplaylist": True,
     "quiet": True,
     "no_warnings": True,
     "default_search": "ytsearch",
     "source_address": "0.0.0.0",
+    # we never use subtitles, don't fetch the translated ones. HLS/DASH manifests stay on:
+    # they're the only formats livestreams have.
+    "extractor_args": {"youtube": {"skip": ["translated_subs"]}},
 }
 
 FFMPEG_OPTIONS = {
@@ -41,25 +79,157 @@ FFMPEG_OPTIONS = {
     "options": "-vn",
 }
 
+# Creating a YoutubeDL loads every extractor, so do it once and reuse it. YoutubeDL isn't
+# thread-safe though, so each yt-dlp worker thread gets its own.
+_ydl_local = threading.local()
+
+
+def _get_ydl() -> yt_dlp.YoutubeDL:
+    ydl = getattr(_ydl_local, "ydl", None)
+    if ydl is None:
+        ydl = _ydl_local.ydl = yt_dlp.YoutubeDL(YTDL_OPTIONS)
+    return ydl
+
+
+# yt-dlp gets its own small thread pool so a burst of /play can't starve the default
+# executor (discord.py uses it too). The semaphore makes extra requests wait their turn.
+YTDL_MAX_WORKERS = 4
+_YDL_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=YTDL_MAX_WORKERS, thread_name_prefix="ytdl")
+_YDL_SEMAPHORE = asyncio.Semaphore(YTDL_MAX_WORKERS)
+
+# Don't queue a 5000 song playlist by accident.
+PLAYLIST_MAX_SONGS = 50
+# Bulk lookups (playlists) may only use this many of the yt-dlp workers at once,
+# so a big playlist can't make everyone else's /play wait behind it.
+BULK_MAX_WORKERS = 2
+_BULK_SEMAPHORE = asyncio.Semaphore(BULK_MAX_WORKERS)
+
+# ==============================
+# METADATA CACHE
+# ==============================
+
+# yt-dlp extraction takes seconds, so remember what we already looked up.
+# YouTube stream URLs are signed and expire after ~6h, so don't keep them longer than 5h.
+SONG_CACHE_TTL = 5 * 3600
+SONG_CACHE_MAX_SIZE = 2000
+
+# Start ffmpeg for the next song this many seconds before the current one ends,
+# so it's already buffering when we switch over.
+PREWARM_SECONDS = 3
+
+# Stay in the voice channel this long after the queue runs out, so the next /play
+# doesn't have to reconnect from scratch.
+IDLE_DISCONNECT_SECONDS = 300
+
+# /queue shows this many songs per page. Embed descriptions max out at 4096 chars, so each
+# line is capped too: long titles get cut and very long links (CDN, attachments) are left out.
+# 10 lines * ~380 chars worst case stays under the limit.
+QUEUE_PAGE_SIZE = 10
+QUEUE_TITLE_MAX_CHARS = 100
+QUEUE_LINK_MAX_CHARS = 200
+
 # ==============================
 # DATA STRUCTURES
 # ==============================
 
-@dataclass
+@dataclass(slots=True)
 class Song:
     url: str           # what the user typed
     title: str
     webpage_url: str   # canonical YouTube link
     duration: int      # seconds
     audio_url: str     # direct stream URL
+    codec: str | None  # audio codec yt-dlp reported, e.g. "opus"
     requested_by: discord.abc.User
+    # ffmpeg source started early by _prewarm, used instead of spawning a new one
+    source: discord.AudioSource | None = field(default=None, repr=False, compare=False)
+    duration_str: str = field(init=False, repr=False, compare=False)  # "3:45", for messages
+
+    def __post_init__(self):
+        self.duration_str = format_duration(self.duration)
+
+
+music_queues: defaultdict[int, Deque[Song]] = defaultdict(deque)  # guild_id -> deque[Song]
+prewarm_tasks: Dict[int, asyncio.Task] = {}  # guild_id -> task preparing the next song
+play_started: Dict[int, float] = {}  # guild_id -> time.monotonic() when the current song started
+leave_timers: Dict[int, asyncio.TimerHandle] = {}  # guild_id -> pending idle disconnect
+next_song_tasks: Set[asyncio.Task] = set()  # start_next_song tasks scheduled from _after_play
+disconnect_tasks: Set[asyncio.Task] = set()  # idle disconnects that are still running
+
+
+def get_queue(guild_id: int) -> Deque[Song]:
+    return music_queues[guild_id]
+
+
+def peek_queue(guild_id: int) -> Deque[Song]:
+    """Like get_queue, but doesn't create an entry for guilds with nothing queued."""
+    return music_queues.get(guild_id) or deque()
 
 
-music_queues: Dict[int, List[Song]] = {}  # guild_id -> list[Song]
+def forget_queue(guild_id: int):
+    """Drop an empty queue so guilds we stopped playing in don't pile up forever."""
+    if not music_queues.get(guild_id):
+        music_queues.pop(guild_id, None)
+        play_started.pop(guild_id, None)
+
+
+def is_active(voice_client: discord.VoiceClient | None) -> bool:
+    """True if the voice client has a song loaded, playing or paused."""
+    return bool(voice_client) and (voice_client.is_playing() or voice_client.is_paused())
+
+
+def discard_source(song: Song):
+    """Kill a pre-spawned ffmpeg process that will never be played."""
+    if song.source is not None:
+        song.source.cleanup()
+        song.source = None
+
+
+def clear_queue(guild_id: int):
+    task = prewarm_tasks.pop(guild_id, None)
+    if task is not None:
+        task.cancel()
+
+    queue = music_queues.pop(guild_id, None)
+    if queue:
+        for song in queue:
+            discard_source(song)
+        queue.clear()
+    play_started.pop(guild_id, None)
+
 
+song_cache: "OrderedDict[str, dict]" = OrderedDict()  # normalized input -> pruned info
+_inflight: Dict[str, asyncio.Future] = {}  # normalized input -> lookup that's running right now
 
-def get_queue(guild_id: int) -> List[Song]:
-    return music_queues.setdefault(guild_id, [])
+
+# "https://...", "www.youtube.com/...", "youtu.be/..." - anything yt-dlp treats as a link, not a search
+_URL_RE = re.compile(r"^(?:[a-z][a-z0-9+.-]*://|www\.|[\w-]+(?:\.[\w-]+)+/)", re.IGNORECASE)
+
+
+def _cache_key(url: str) -> str:
+    url = url.strip()
+    if _URL_RE.match(url):
+        return url  # video IDs are case-sensitive, dQw4w9WgXcQ != DQW4W9WGXCQ
+    return url.lower()
+
+
+def _cache_get(key: str) -> dict | None:
+    entry = song_cache.get(key)
+    if entry is None:
+        return None
+    if entry["_expires"] <= time.time():
+        # stream URL is (about to be) dead, fetch it again
+        del song_cache[key]
+        return None
+    song_cache.move_to_end(key)
+    return entry
+
+
+def _cache_put(key: str, entry: dict):
+    song_cache[key] = entry
+    song_cache.move_to_end(key)
+    while len(song_cache) > SONG_CACHE_MAX_SIZE:
+        song_cache.popitem(last=False)
 
 
 def format_duration(seconds: int | None) -> str:
@@ -72,84 +242,316 @@ def format_duration(seconds: int | None) -> str:
     return f"{m}:{s:02d}"
 
 
-async def fetch_song(url: str, requester: discord.abc.User) -> Song:
-    """Use yt-dlp to extract audio info without downloading the file."""
-    loop = asyncio.get_running_loop()
+def is_playlist_url(url: str) -> bool:
+    return "youtube.com/playlist" in url and "list=" in url
 
-    def _extract():
-        with yt_dlp.YoutubeDL(YTDL_OPTIONS) as ydl:
-            return ydl.extract_info(url, download=False)
 
-    info = await loop.run_in_executor(None, _extract)
+async def _run_ytdl(func):
+    """Run a blocking yt-dlp call on the yt-dlp thread pool."""
+    loop = asyncio.get_running_loop()
+    async with _YDL_SEMAPHORE:
+        return await loop.run_in_executor(_YDL_EXECUTOR, func)
+
 
-    # If it was a playlist/search, take the first entry
-    if "entries" in info:
-        info = info["entries"][0]
+async def fetch_song(url: str, requester: discord.abc.User) -> Song:
+    """Use yt-dlp to extract audio info without downloading the file."""
+    key = _cache_key(url)
+    entry = _cache_get(key)
 
-    audio_url = info["url"]
-    title = info.get("title", "Unknown title")
-    webpage_url = info.get("webpage_url", url)
-    duration = info.get("duration", 0)
+    while entry is None and key in _inflight:
+        # someone else is already looking this up, just wait for their result
+        shared = _inflight[key]
+        try:
+            entry = await asyncio.shield(shared)
+        except asyncio.CancelledError:
+            if not shared.cancelled():
+                raise  # we were cancelled ourselves
+            # their lookup was cancelled (e.g. a skipped prewarm), not ours: look it up again
+
+    if entry is None:
+        fut = asyncio.get_running_loop().create_future()
+        _inflight[key] = fut
+        try:
+            entry = await _extract_entry(url)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as exc:
+            fut.set_exception(exc)
+            fut.exception()  # mark as retrieved, the caller below gets the error anyway
+            raise
+        else:
+            fut.set_result(entry)
+            _cache_put(key, entry)
+        finally:
+            if _inflight.get(key) is fut:
+                del _inflight[key]
 
     return Song(
         url=url,
-        title=title,
-        webpage_url=webpage_url,
-        duration=duration,
-        audio_url=audio_url,
+        title=entry["title"],
+        webpage_url=entry["webpage_url"],
+        duration=entry["duration"],
+        audio_url=entry["audio_url"],
+        codec=entry["codec"],
         requested_by=requester,
     )
 
 
+async def _extract_entry(url: str) -> dict:
+    """Run yt-dlp on a URL or search term and keep just the fields a Song needs."""
+    def _extract():
+        ydl = _get_ydl()
+
+        # process=False keeps playlist/search entries lazy, so we only resolve the one we play
+        info = ydl.extract_info(url, download=False, process=False)
+
+        # Search terms come back as a "url" result pointing at ytsearch:..., playlists with
+        # lazy entries. Keep unwrapping until we reach the video itself.
+        for _ in range(5):
+            if "entries" in info:
+                info = next(iter(info["entries"] or []), None)
+                if info is None:
+                    raise ValueError("No results found.")
+            elif info.get("_type") in ("url", "url_transparent"):
+                info = ydl.extract_info(info["url"], download=False, ie_key=info.get("ie_key"), process=False)
+            else:
+                break
+
+        info = ydl.process_ie_result(info, download=False)
+
+        # still a playlist after processing, take its first (now resolved) entry
+        if "entries" in info:
+            info = next(iter(info["entries"] or []), None) or {}
+        if "url" not in info:
+            raise ValueError("No playable audio found.")
+        return info
+
+    info = await _run_ytdl(_extract)
+
+    # only keep what we need, the full info dict is huge
+    return {
+        "title": info.get("title", "Unknown title"),
+        "webpage_url": info.get("webpage_url", url),
+        "duration": info.get("duration", 0),
+        "audio_url": info["url"],
+        "codec": info.get("acodec"),
+        "_expires": time.time() + SONG_CACHE_TTL,
+    }
+
+
+async def fetch_songs(urls: List[str], requester: discord.abc.User) -> List[Song]:
+    """Fetch several songs at once. Links that fail are skipped."""
+    async def _fetch(u: str) -> Song:
+        async with _BULK_SEMAPHORE:
+            return await fetch_song(u, requester)
+
+    results = await asyncio.gather(*(_fetch(u) for u in urls), return_exceptions=True)
+    songs = []
+    for u, result in zip(urls, results):
+        if isinstance(result, Exception):
+            logger.error("Error fetching %s: %s", u, result)
+        else:
+            songs.append(result)
+    return songs
+
+
+async def fetch_playlist(url: str, requester: discord.abc.User) -> List[Song]:
+    """List the videos in a playlist without resolving them, then fetch them all in parallel."""
+    def _list_entries():
+        # entries is a generator that fetches pages as it goes, so consume it off the event loop
+        info = _get_ydl().extract_info(url, download=False, process=False)
+        entries = itertools.islice(info.get("entries") or [], PLAYLIST_MAX_SONGS)
+        return [e.get("webpage_url") or e["url"] for e in entries if e]
+
+    urls = await _run_ytdl(_list_entries)
+    return await fetch_songs(urls, requester)
+
+
+def _spawn_next_song(guild_id: int, bot: commands.Bot):
+    """Runs on the event loop (via call_soon_threadsafe) after a song finishes."""
+    task = asyncio.create_task(start_next_song(guild_id, bot))
+    # the loop only keeps weak references to tasks, hold on to it until it's done
+    next_song_tasks.add(task)
+    task.add_done_callback(_next_song_done)
+
+
+def _next_song_done(task: asyncio.Task):
+    next_song_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.error("Error starting next song: %s", exc)
+
+
+def schedule_prewarm(guild_id: int):
+    """Start preparing queue[1] if it isn't being prepared already."""
+    queue = peek_queue(guild_id)
+    if len(queue) < 2 or guild_id in prewarm_tasks:
+        return
+    prewarm_tasks[guild_id] = asyncio.create_task(_prewarm(guild_id, queue[0], queue[1]))
+
+
+async def create_source(audio_url: str, codec: str | None = None) -> discord.AudioSource:
+    """Start ffmpeg for a stream, copying the Opus audio straight through when possible."""
+    if codec == "opus":
+        # yt-dlp already told us it's Opus, no need to spawn ffprobe to find out
+        return discord.FFmpegOpusAudio(
+            audio_url,
+            codec="copy",
+            before_options=FFMPEG_OPTIONS["before_options"],
+            options=FFMPEG_OPTIONS["options"],
+        )
+
+    try:
+        return await discord.FFmpegOpusAudio.from_probe(
+            audio_url,
+            before_options=FFMPEG_OPTIONS["before_options"],
+            options=FFMPEG_OPTIONS["options"],
+        )
+    except Exception as exc:
+        logger.warning("Opus probe failed, falling back to PCM: %s", exc)
+        return discord.FFmpegPCMAudio(audio_url, **FFMPEG_OPTIONS)
+
+
+async def _prewarm(guild_id: int, current: Song, next_song: Song):
+    """Get the next song ready while the current one is still playing."""
+    # refresh the stream URL first, the cached one may have expired by now
+    try:
+        fresh = await fetch_song(next_song.url, next_song.requested_by)
+        next_song.audio_url = fresh.audio_url
+        next_song.codec = fresh.codec
+    except Exception as exc:
+        logger.error("Error prefetching %s: %s", next_song.title, exc)
+        return
+
+    if not current.duration:
+        return  # don't know when it ends, just spawn ffmpeg normally later
+
+    elapsed = time.monotonic() - play_started.get(guild_id, time.monotonic())
+    await asyncio.sleep(max(0, current.duration - elapsed - PREWARM_SECONDS))
+
+    queue = peek_queue(guild_id)
+    if len(queue) < 2 or queue[0] is not current or queue[1] is not next_song:
+        return  # queue changed (skip/stop) while we were waiting
+    if next_song.source is not None:
+        return
+
+    try:
+        source = await create_source(next_song.audio_url, next_song.codec)
+    except Exception as exc:
+        logger.error("Error pre-spawning ffmpeg for %s: %s", next_song.title, exc)
+        return
+
+    if len(queue) >= 2 and queue[0] is current and queue[1] is next_song:
+        next_song.source = source
+    else:
+        source.cleanup()  # queue changed while the source was being created
+
+
+def schedule_idle_disconnect(guild_id: int, bot: commands.Bot):
+    cancel_idle_disconnect(guild_id)
+    loop = asyncio.get_running_loop()
+    leave_timers[guild_id] = loop.call_later(IDLE_DISCONNECT_SECONDS, _do_disconnect, guild_id, bot)
+
+
+def cancel_idle_disconnect(guild_id: int):
+    handle = leave_timers.pop(guild_id, None)
+    if handle is not None:
+        handle.cancel()
+
+
+def ensure_idle_disconnect(guild_id: int, bot: commands.Bot):
+    """Start the idle timer if we're sitting in voice with nothing to play (e.g. after a failed /play)."""
+    guild = bot.get_guild(guild_id)
+    voice_client = guild.voice_client if guild else None
+    if guild_id in leave_timers or is_active(voice_client) or peek_queue(guild_id):
+        return
+    schedule_idle_disconnect(guild_id, bot)
+
+
+def _do_disconnect(guild_id: int, bot: commands.Bot):
+    leave_timers.pop(guild_id, None)
+
+    guild = bot.get_guild(guild_id)
+    voice_client = guild.voice_client if guild else None
+    if voice_client is None or not voice_client.is_connected():
+        return
+    if is_active(voice_client) or peek_queue(guild_id):
+        return  # someone queued something in the meantime
+
+    logger.info("Leaving idle voice channel in %s", guild.name)
+    task = asyncio.create_task(voice_client.disconnect())
+    disconnect_tasks.add(task)
+    task.add_done_callback(disconnect_tasks.discard)
+
+
 async def start_next_song(guild_id: int, bot: commands.Bot):
     """If nothing is playing, start the first song in the queue for this guild."""
     guild = bot.get_guild(guild_id)
     if guild is None:
         return
 
-    queue = get_queue(guild_id)
+    queue = peek_queue(guild_id)
     if not queue:
+        # queue ran out, leave later if nobody plays anything else
+        forget_queue(guild_id)
+        schedule_idle_disconnect(guild_id, bot)
         return
 
     voice_client: discord.VoiceClient | None = guild.voice_client
     if voice_client is None or not voice_client.is_connected():
         # No voice client, clear queue (nowhere to play)
-        queue.clear()
+        clear_queue(guild_id)
         return
 
     # If something is already playing or paused, do nothing.
-    if voice_client.is_playing() or voice_client.is_paused():
+    if is_active(voice_client):
         return
 
     song = queue[0]
 
     def _after_play(error: Exception | None):
         if error:
-            print(f"[Player error in guild {guild_id}]: {error}")
+            logger.error("Player error in guild %s: %s", guild_id, error)
 
         # remove the song that just finished
-        q = get_queue(guild_id)
+        q = music_queues.get(guild_id)
         if q:
-            q.pop(0)
+            q.popleft()
 
-        # schedule the next song on the event loop
-        fut = asyncio.run_coroutine_threadsafe(start_next_song(guild_id, bot), bot.loop)
-        try:
-            fut.result()
-        except Exception as exc:
-            print(f"[Error starting next song]: {exc}")
+        # schedule the next song on the event loop, but don't wait for it here:
+        # this runs on the ffmpeg reader thread and blocking it causes gaps
+        bot.loop.call_soon_threadsafe(_spawn_next_song, guild_id, bot)
 
-    source = discord.FFmpegPCMAudio(song.audio_url, **FFMPEG_OPTIONS)
+    task = prewarm_tasks.pop(guild_id, None)
+    if task is not None:
+        task.cancel()
+
+    # use the ffmpeg process _prewarm already started, if there is one
+    source = song.source or await create_source(song.audio_url, song.codec)
+    song.source = None
+
+    # creating the source can take a moment, something else may have started playing meanwhile
+    if is_active(voice_client) or not queue or queue[0] is not song:
+        source.cleanup()
+        return
 
     try:
         voice_client.play(source, after=_after_play)
-        print(f"[Now playing in {guild.name}]: {song.title}")
+        play_started[guild_id] = time.monotonic()
+        logger.info("Now playing in %s: %s", guild.name, song.title)
     except Exception as exc:
-        print(f"[Error starting playback]: {exc}")
+        logger.error("Error starting playback: %s", exc)
+        source.cleanup()
         # drop this song and try the next one
-        if queue and queue[0] == song:
-            queue.pop(0)
+        if queue and queue[0] is song:
+            queue.popleft()
         await start_next_song(guild_id, bot)
+        return
+
+    schedule_prewarm(guild_id)
 
 
 # ==============================
@@ -163,20 +565,97 @@ intents.voice_states = True  # needed for voice
 bot = commands.Bot(command_prefix="!", intents=intents)
 
 
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    # kicked from the server, nothing left to play there
+    clear_queue(guild.id)
+    cancel_idle_disconnect(guild.id)
+
+
 @bot.event
 async def on_ready():
-    print(f"Logged in as {bot.user} (ID: {bot.user.id})")
+    logger.info("Logged in as %s (ID: %s)", bot.user, bot.user.id)
 
     try:
         if GUILD_ID:
             guild_obj = discord.Object(id=GUILD_ID)
             synced = await bot.tree.sync(guild=guild_obj)
-            print(f"Synced {len(synced)} command(s) to guild {GUILD_ID}")
+            logger.info("Synced %d command(s) to guild %s", len(synced), GUILD_ID)
         else:
             synced = await bot.tree.sync()
-            print(f"Synced {len(synced)} global command(s)")
+            logger.info("Synced %d global command(s)", len(synced))
     except Exception as e:
-        print("Failed to sync slash commands:", e)
+        logger.error("Failed to sync slash commands: %s", e)
+
+
+# ==============================
+# QUEUE DISPLAY
+# ==============================
+
+def queue_page_count(queue: Deque[Song]) -> int:
+    return max(1, -(-len(queue) // QUEUE_PAGE_SIZE))
+
+
+def build_queue_embed(guild: discord.Guild, page: int) -> discord.Embed:
+    """Render one page of the queue. Only the songs on that page are formatted."""
+    queue = peek_queue(guild.id)
+    pages = queue_page_count(queue)
+    page = max(0, min(page, pages - 1))
+
+    voice_client = guild.voice_client
+    is_playing = bool(voice_client and voice_client.is_playing())
+
+    start = page * QUEUE_PAGE_SIZE
+    lines = []
+    for i, song in enumerate(itertools.islice(queue, start, start + QUEUE_PAGE_SIZE), start=start + 1):
+        prefix = "▶️" if i == 1 and is_playing else f"{i}."
+        title = song.title
+        if len(title) > QUEUE_TITLE_MAX_CHARS:
+            title = title[:QUEUE_TITLE_MAX_CHARS - 1] + "…"
+        if len(song.webpage_url) <= QUEUE_LINK_MAX_CHARS:
+            title = f"[{title}]({song.webpage_url})"
+        lines.append(
+            f"{prefix} **{title}** "
+            f"(`{song.duration_str}`) - requested by `{song.requested_by.display_name}`"
+        )
+
+    embed = discord.Embed(title="🎶 Music queue", description="\n".join(lines), color=0x5865F2)
+    if pages > 1:
+        embed.set_footer(text=f"Page {page + 1}/{pages} • {len(queue)} songs")
+    return embed
+
+
+class QueueView(discord.ui.View):
+    """Previous/next buttons for /queue. Each click re-renders the current page from the live queue."""
+
+    def __init__(self, guild: discord.Guild):
+        super().__init__(timeout=120)
+        self.guild = guild
+        self.page = 0
+        self.message: discord.InteractionMessage | None = None  # set by queue_cmd after sending
+
+    async def on_timeout(self):
+        # buttons stop working after the timeout, so grey them out
+        for item in self.children:
+            item.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass  # message was deleted, nothing to update
+
+    async def _show_page(self, interaction: discord.Interaction, page: int):
+        pages = queue_page_count(peek_queue(self.guild.id))
+        self.page = max(0, min(page, pages - 1))
+        await interaction.response.edit_message(embed=build_queue_embed(self.guild, self.page), view=self)
+
+    @discord.ui.button(label="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show_page(interaction, self.page - 1)
+
+    @discord.ui.button(label="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show_page(interaction, self.page + 1)
 
 
 # ==============================
@@ -209,30 +688,50 @@ async def play_cmd(interaction: discord.Interaction, url: str):
         elif voice_client.channel != voice_channel:
             await voice_client.move_to(voice_channel)
     except Exception as e:
+        ensure_idle_disconnect(guild.id, bot)
         await interaction.followup.send(f"I couldn't join your voice channel: `{e}`", ephemeral=True)
         return
 
+    # don't let the idle timer kick us out while we're still looking the song up;
+    # the error paths below re-arm it if nothing ends up queued
+    cancel_idle_disconnect(guild.id)
+
     # Fetch song info
     try:
-        song = await fetch_song(url, requester=user)
+        if is_playlist_url(url):
+            songs = await fetch_playlist(url, requester=user)
+        else:
+            songs = [await fetch_song(url, requester=user)]
     except Exception as e:
+        ensure_idle_disconnect(guild.id, bot)
         await interaction.followup.send(f"Couldn't get audio from that link: `{e}`", ephemeral=True)
         return
 
+    if not songs:
+        ensure_idle_disconnect(guild.id, bot)
+        await interaction.followup.send("Couldn't get any songs from that playlist.", ephemeral=True)
+        return
+
     queue = get_queue(guild.id)
-    queue.append(song)
+    position = len(queue) + 1
+    queue.extend(songs)
+    cancel_idle_disconnect(guild.id)  # another /play may have failed and re-armed it meanwhile
 
-    if not voice_client.is_playing() and not voice_client.is_paused():
+    song = songs[0]
+    if not is_active(voice_client):
         # nothing playing -> start immediately
         await start_next_song(guild.id, bot)
-        msg = f"▶️ Now playing: **[{song.title}]({song.webpage_url})** (`{format_duration(song.duration)}`)"
+        msg = f"▶️ Now playing: **[{song.title}]({song.webpage_url})** (`{song.duration_str}`)"
     else:
-        position = len(queue)
+        schedule_prewarm(guild.id)
         msg = (
             f"➕ Added to queue at position **{position}**:\n"
-            f"**[{song.title}]({song.webpage_url})** (`{format_duration(song.duration)}`)"
+            f"**[{song.title}]({song.webpage_url})** (`{song.duration_str}`)"
         )
 
+    if len(songs) > 1:
+        msg += f"\n➕ Plus **{len(songs) - 1}** more from the playlist."
+
     await interaction.followup.send(msg)
 
 
@@ -247,7 +746,7 @@ async def skip_cmd(interaction: discord.Interaction):
         await interaction.response.send_message("I'm not in a voice channel.", ephemeral=True)
         return
 
-    if not voice_client.is_playing() and not voice_client.is_paused():
+    if not is_active(voice_client):
         await interaction.response.send_message("Nothing is playing right now.", ephemeral=True)
         return
 
@@ -262,11 +761,10 @@ async def stop_cmd(interaction: discord.Interaction):
         return
 
     guild_id = interaction.guild.id
-    queue = get_queue(guild_id)
-    queue.clear()
+    clear_queue(guild_id)
 
     voice_client = interaction.guild.voice_client
-    if voice_client and (voice_client.is_playing() or voice_client.is_paused()):
+    if is_active(voice_client):
         voice_client.stop()
 
     await interaction.response.send_message("⏹️ Stopped playback and cleared the queue.")
@@ -279,8 +777,8 @@ async def leave_cmd(interaction: discord.Interaction):
         return
 
     guild_id = interaction.guild.id
-    queue = get_queue(guild_id)
-    queue.clear()
+    clear_queue(guild_id)
+    cancel_idle_disconnect(guild_id)
 
     voice_client = interaction.guild.voice_client
     if voice_client and voice_client.is_connected():
@@ -296,23 +794,17 @@ async def queue_cmd(interaction: discord.Interaction):
         await interaction.response.send_message("This command only works in a server.", ephemeral=True)
         return
 
-    queue = get_queue(interaction.guild.id)
+    queue = peek_queue(interaction.guild.id)
     if not queue:
         await interaction.response.send_message("📭 The queue is empty.")
         return
 
-    lines = []
-    for i, song in enumerate(queue, start=1):
-        prefix = "▶️" if i == 1 and interaction.guild.voice_client and interaction.guild.voice_client.is_playing() else f"{i}."
-        lines.append(
-            f"{prefix} **[{song.title}]({song.webpage_url})** "
-            f"(`{format_duration(song.duration)}`) - requested by `{song.requested_by.display_name}`"
-        )
-
-    # Discord embed descriptions have a max length, but your queue won't be THAT cursed, probably.
-    description = "\n".join(lines)
-    embed = discord.Embed(title="🎶 Music queue", description=description, color=0x5865F2)
-    await interaction.response.send_message(embed=embed)
+    if queue_page_count(queue) > 1:
+        view = QueueView(interaction.guild)
+        await interaction.response.send_message(embed=build_queue_embed(interaction.guild, 0), view=view)
+        view.message = await interaction.original_response()
+    else:
+        await interaction.response.send_message(embed=build_queue_embed(interaction.guild, 0))
 
 
 # ==============================
@@ -322,4 +814,8 @@ async def queue_cmd(interaction: discord.Interaction):
 if __name__ == "__main__":
     if not TOKEN or TOKEN == "PASTE_YOUR_BOT_TOKEN_HERE":
         raise RuntimeError("You forgot to put your bot token in the code or DISCORD_TOKEN env var.")
-    bot.run(TOKEN)
+    log_listener = setup_logging()
+    try:
+        bot.run(TOKEN)
+    finally:
+        log_listener.stop()